@@ -1,19 +1,25 @@
 import csv
+from itertools import chain
+from operator import itemgetter
 
 def count_unique_ids(csv_path, col1, col2):
-    unique_ids = set()
-
     with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        # Plain csv.reader + column positions: no per-row dict like DictReader builds.
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = [col for col in (col1, col2) if col not in header]
+        if missing:
+            raise ValueError(f"{csv_path} has no column(s) {missing}; header is {header}")
+        first, second = header.index(col1), header.index(col2)
+        pick = itemgetter(first, second)
 
-        for row in reader:
-            v1 = row.get(col1)
-            v2 = row.get(col2)
+        # Pad short rows with empty cells, as DictReader would, instead of failing.
+        width = max(first, second) + 1
+        rows = (row if len(row) >= width else row + [""] * (width - len(row)) for row in reader)
 
-            if v1:
-                unique_ids.add(v1.strip())
-            if v2:
-                unique_ids.add(v2.strip())
+        # map/chain/set iterate in C; only the padding check runs as Python per row.
+        unique_ids = set(map(str.strip, chain.from_iterable(map(pick, rows))))
+    unique_ids.discard("")
 
     print(f"Total unique IDs across '{col1}' and '{col2}': {len(unique_ids)}")
     # return unique_ids
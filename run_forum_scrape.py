@@ -1,32 +1,21 @@
 import argparse
 import csv
-import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from urllib.parse import urlparse
 
-from scraper.data_model import (
-    INTERACTIONS_FIELDNAMES,
-    POSTS_FIELDNAMES,
-    THREADS_FIELDNAMES,
-    USERS_FIELDNAMES,
-)
-from scraper.post_scraper import absolute_url, get_thread_list, scrape_thread
+from scraper.post_scraper import DEFAULT_THREAD_WORKERS, absolute_url
+from scraper.rate_limiter import DEFAULT_PERIOD, configure_rate_limiter
+from scraper.runners import POSTS_FORMATS, configure_logging, run_forum
 
 FORUMS_CSV_PATH = Path("forums.csv")
+MAX_FORUM_PROCESSES = 8
 
-def _slug_from_url(url: str) -> str:
-    path = urlparse(url).path.strip("/")
-    if not path:
-        return "forums"
-    tail = path.split("/")[-1]
-    cleaned = re.sub(r"\.\d+$", "", tail)
-    return cleaned or "forums"
-
-def load_forums(csv_path: Path) -> list[dict[str, str]]:
+def load_forums(csv_path: Path) -> Iterator[dict[str, str]]:
+    """Stream forums from forums.csv one row at a time (rows without an href are skipped)."""
     if not csv_path.exists():
         raise FileNotFoundError(f"Forums CSV not found at {csv_path}")
 
-    forums: list[dict[str, str]] = []
     with open(csv_path, newline="", encoding="utf-8") as csv_file:
         reader = csv.DictReader(csv_file)
         for row in reader:
@@ -34,120 +23,122 @@ def load_forums(csv_path: Path) -> list[dict[str, str]]:
             name = row.get("forum_name") or href or "unknown"
             if not href:
                 continue
-            forums.append({"forum_name": name, "forum_href": absolute_url(str(href))})
-    return forums
-
-def scrape_single_forum(
-    *,
-    forum_name: str,
-    forum_url: str,
-    max_forum_pages: int | None,
-    thread_limit: int | None,
-    thread_page_limit: int | None,
-):
-    slug = _slug_from_url(forum_url)
-    threads_csv_path = f"data/threads-{slug}.csv"
-    posts_csv_path = f"data/posts-{slug}.csv"
-    users_csv_path = f"data/users-{slug}.csv"
-    interactions_csv_path = f"data/interactions-{slug}.csv"
-
-    print(f"[main] Scraping forum '{forum_name}' ({forum_url})")
-
-    thread_urls = get_thread_list(
-        forum_url,
-        max_pages=max_forum_pages,
-        thread_limit=thread_limit,
-    )
-    print(f"[main] Fetched {len(thread_urls)} thread URLs for {forum_name}")
-
-    user_cache: dict[str, dict] = {}
-    written_user_ids: set[str] = set()
-
-    with (
-        open(posts_csv_path, "w", newline="", encoding="utf-8") as posts_f,
-        open(interactions_csv_path, "w", newline="", encoding="utf-8") as interactions_f,
-        open(threads_csv_path, "w", newline="", encoding="utf-8") as threads_f,
-        open(users_csv_path, "w", newline="", encoding="utf-8") as users_f,
-    ):
-        posts_writer = csv.DictWriter(posts_f, fieldnames=POSTS_FIELDNAMES)
-        posts_writer.writeheader()
-
-        interactions_writer = csv.DictWriter(interactions_f, fieldnames=INTERACTIONS_FIELDNAMES)
-        interactions_writer.writeheader()
-
-        threads_writer = csv.DictWriter(threads_f, fieldnames=THREADS_FIELDNAMES)
-        threads_writer.writeheader()
-
-        users_writer = csv.DictWriter(users_f, fieldnames=USERS_FIELDNAMES)
-        users_writer.writeheader()
-
-        for i, t_url in enumerate(thread_urls, start=1):
-            print(f"[main] ({i}/{len(thread_urls)}) Scraping thread: {t_url}")
-            try:
-                posts, interactions, thread_row = scrape_thread(
-                    t_url,
-                    user_cache,
-                    max_pages=thread_page_limit,
-                    forum_url=forum_url,
-                )
-            except Exception as exc:  # noqa: BLE001 - continue on thread failure
-                print(f"[main] Error scraping {t_url}: {exc}")
-                continue
-
-            for row in posts:
-                posts_writer.writerow(row)
-
-            for interaction in interactions:
-                interactions_writer.writerow(interaction)
-
-            threads_writer.writerow(thread_row)
-
-            for user_id, user in user_cache.items():
-                if not user_id or user_id in written_user_ids:
-                    continue
-                users_writer.writerow(user)
-                written_user_ids.add(user_id)
-
-    print(
-        "[main] Finished forum '{0}'. Outputs: {1}, {2}, {3}, {4}".format(
-            forum_name, posts_csv_path, users_csv_path, interactions_csv_path, threads_csv_path
-        )
+            yield {"forum_name": name, "forum_href": absolute_url(str(href))}
+
+def _select_forums(indices: list[int]) -> list[dict[str, str]]:
+    """Pick the requested rows out of forums.csv, reading only as far as needed."""
+    wanted = set(indices)
+    selected: dict[int, dict[str, str]] = {}
+    seen = 0
+    for seen, candidate in enumerate(load_forums(FORUMS_CSV_PATH), start=1):
+        if seen - 1 in wanted:
+            selected[seen - 1] = candidate
+            if len(selected) == len(wanted):
+                break
+
+    if not seen:
+        raise RuntimeError("forums.csv is empty, run get_forums_scrape.py first")
+    missing = sorted(wanted - selected.keys())
+    if missing:
+        raise IndexError(f"forum-index {missing[0]} out of range (0-{seen - 1})")
+    return [selected[i] for i in dict.fromkeys(indices)]
+
+def _init_forum_process(period: float) -> None:
+    # Each forum process has its own rate limiter; `period` decides whether they
+    # split the single-process budget or each get all of it.
+    configure_rate_limiter(period=period)
+    configure_logging()
+
+def _scrape_forum_worker(forum: dict[str, str], max_workers: int, posts_format: str) -> None:
+    run_forum(
+        forum["forum_href"],
+        forum_name=forum["forum_name"],
+        max_workers=max_workers,
+        posts_format=posts_format,
     )
 
 def _parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Scrape a single forum by index from forums.csv")
+    parser = argparse.ArgumentParser(description="Scrape one or more forums by index from forums.csv")
     parser.add_argument(
         "--forum-index",
         type=int,
-        default=0,
-        help="Zero-based index inside forums.csv to scrape",
+        nargs="+",
+        default=[0],
+        help="Zero-based index (or indices) inside forums.csv to scrape",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_THREAD_WORKERS,
+        help="Threads scraped concurrently (requests still share one rate limiter)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help=(
+            "Forums scraped in parallel processes (default: one per forum, max 8). "
+            "The processes split the usual request budget between them."
+        ),
+    )
+    parser.add_argument(
+        "--rate-per-process",
+        action="store_true",
+        help=(
+            "Give every forum process the full request budget instead of a share of it. "
+            "This multiplies the request rate to the host by --processes."
+        ),
+    )
+    parser.add_argument(
+        "--posts-format",
+        choices=POSTS_FORMATS,
+        default="csv",
+        help="Write posts as CSV (default) or NDJSON, which is much cheaper to emit for long post bodies",
     )
     return parser.parse_args()
 
 def main() -> None:
     args = _parse_args()
-    forums = load_forums(FORUMS_CSV_PATH)
-    if not forums:
-        raise RuntimeError("forums.csv is empty, run get_forums_scrape.py first")
+    configure_logging()
+    for index in args.forum_index:
+        if index < 0:
+            raise IndexError(f"forum-index {index} must be non-negative")
 
-    if args.forum_index < 0 or args.forum_index >= len(forums):
-        raise IndexError(
-            f"forum-index {args.forum_index} out of range (0-{len(forums) - 1})"
-        )
-
-    forum = forums[args.forum_index]
+    forums = _select_forums(args.forum_index)
     print(
-        f"[main] Loaded {len(forums)} forums from {FORUMS_CSV_PATH}; "
-        f"scraping index {args.forum_index}: {forum['forum_name']}"
+        f"[main] Loaded {len(forums)} forum(s) from {FORUMS_CSV_PATH}: "
+        + ", ".join(forum["forum_name"] for forum in forums)
     )
 
-    scrape_single_forum(
-        forum_name=forum["forum_name"],
-        forum_url=forum["forum_href"],
-        max_forum_pages=None,
-        thread_limit=None,
-        thread_page_limit=None,
-    )
+    processes = min(args.processes or MAX_FORUM_PROCESSES, len(forums))
+    if processes <= 1:
+        for forum in forums:
+            _scrape_forum_worker(forum, args.workers, args.posts_format)
+        return
+
+    # Forums write disjoint output files, so they can run side by side in
+    # separate processes. They do share the SQLite user cache: WAL lets them use
+    # it concurrently, but the per-user fetch locks are per process, so two
+    # processes can still both fetch a member neither has cached yet.
+    # All processes hit the same host, so by default they split one limiter's
+    # budget: each waits `processes` times as long between requests.
+    period = DEFAULT_PERIOD if args.rate_per_process else DEFAULT_PERIOD * processes
+    print(f"[main] Running {processes} forum processes (rate-limit period {period:g}s each)")
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_forum_process,
+        initargs=(period,),
+    ) as executor:
+        futures = {
+            executor.submit(_scrape_forum_worker, forum, args.workers, args.posts_format): forum
+            for forum in forums
+        }
+        for future in as_completed(futures):
+            forum = futures[future]
+            try:
+                future.result()
+            except Exception as exc:  # noqa: BLE001 - keep the other forums going
+                print(f"[main] Error scraping forum '{forum['forum_name']}': {exc}")
 
 if __name__ == "__main__":
     main()
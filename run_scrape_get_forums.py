@@ -1,5 +1,6 @@
 import csv
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from scraper.rate_limiter import fetch
@@ -7,20 +8,24 @@ from scraper.rate_limiter import fetch
 FORUM_INDEX_URL = "https://www.personalitycafe.com/forums/"
 OUTPUT_CSV = "forums.csv"
 
+_SEL_NODE = sv.compile("div.node-body")
+_SEL_NODE_LINK = sv.compile("div.node-main h3.node-title a")
+_SEL_SUBNODE_LINK = sv.compile("ol.subNodeMenu a.subNodeLink")
+
 def parse_forums(html) -> list[dict[str, str | None]]:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     results: list[dict[str, str | None]] = []
     print(f"[parse-forums] Now parsing forums")
 
     num_forums = 0
-    for node in soup.select("div.node-body"):
+    for node in _SEL_NODE.select(soup):
         num_forums += 1
-        main_link = node.select_one("div.node-main h3.node-title a")
+        main_link = _SEL_NODE_LINK.select_one(node)
         if main_link:
             results.append({"forum_name": main_link.get_text(strip=True),
                             "forum_href": main_link.get("href")}) # type: ignore
 
-        for sub in node.select("ol.subNodeMenu a.subNodeLink"):
+        for sub in _SEL_SUBNODE_LINK.select(node):
             results.append({"forum_name": sub.get_text(strip=True),
                             "forum_href": sub.get("href")}) # type: ignore
 
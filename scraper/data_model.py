@@ -1,16 +1,25 @@
 """Shared schema metadata for CSV outputs."""
 
-POSTS_FIELDNAMES: list[str] = [
-    "thread_id",
-    "thread_url",
-    "page_url",
-    "post_id",
-    "user_id",
-    "username",
-    "timestamp",
-    "text",
-    "scraped_at",
-]
+from typing import NamedTuple
+
+# Output files are written sequentially, so a large buffer collapses many
+# small row writes into few write() syscalls.
+CSV_BUFFER_SIZE: int = 1 << 20
+
+class PostRow(NamedTuple):
+    """One `Post` row, emitted as a plain tuple via csv.writer."""
+    thread_id: str
+    thread_url: str
+    page_url: str
+    post_id: str | None
+    user_id: str | None
+    username: str | None
+    timestamp: str | None
+    text: str | None
+    scraped_at: str
+
+
+POSTS_FIELDNAMES: list[str] = list(PostRow._fields)
 
 USERS_FIELDNAMES: list[str] = [
     "user_id",
@@ -34,23 +43,30 @@ USERS_FIELDNAMES: list[str] = [
     "scraped_at",
 ]
 
-INTERACTIONS_FIELDNAMES: list[str] = [
-    "interaction_id",
-    "replying_post_id",
-    "target_post_id",
-    "source_user_id",
-    "target_user_id",
-    "thread_id",
-    "interaction_type",
-    "confidence",
-    "scraped_at",
-]
+class InteractionRow(NamedTuple):
+    """One derived `Interaction` row, emitted as a plain tuple via csv.writer."""
+    interaction_id: str
+    replying_post_id: str
+    target_post_id: str | None
+    source_user_id: str | None
+    target_user_id: str | None
+    thread_id: str
+    interaction_type: str
+    confidence: float
+    scraped_at: str
 
-THREADS_FIELDNAMES: list[str] = [
-    "thread_id",
-    "thread_url",
-    "forum_url",
-    "first_seen",
-    "last_seen",
-    "scraped_at",
-]
+
+INTERACTIONS_FIELDNAMES: list[str] = list(InteractionRow._fields)
+
+
+class ThreadRow(NamedTuple):
+    """One `Thread` row, emitted as a plain tuple via csv.writer."""
+    thread_id: str
+    thread_url: str
+    forum_url: str | None
+    first_seen: str
+    last_seen: str
+    scraped_at: str
+
+
+THREADS_FIELDNAMES: list[str] = list(ThreadRow._fields)
@@ -1,21 +1,35 @@
+import functools
 import hashlib
 import re
-from datetime import datetime
+import time
+from collections import deque
+from collections.abc import Callable, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
-from uuid import uuid4
 
-from bs4 import BeautifulSoup
+import requests
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
 
-from scraper.rate_limiter import fetch
-from scraper.user_scraper import get_or_fetch_user, extract_user_id_from_profile_url
+from scraper.data_model import InteractionRow, PostRow, ThreadRow
+from scraper.rate_limiter import fetch_bytes
+from scraper.user_scraper import fetch_users, get_or_fetch_user, extract_user_id_from_profile_url
 
 BASE_URL = "https://www.personalitycafe.com"
+_BASE_URL_SLASH = BASE_URL + "/"
+
+# Threads scraped in parallel by `scrape_threads`; every fetch still goes
+# through the shared rate limiter, so this only overlaps network wait + parsing.
+DEFAULT_THREAD_WORKERS = 4
+# Pages of a single thread downloaded concurrently once the page count is known.
+PAGE_FETCH_WORKERS = 4
 
 # Thread index selectors
 THREAD_CARD_SELECTOR = "div.structItem--thread"
 THREAD_LINK_SELECTOR = "h3.structItem-title a"
 NEXT_PAGE_SELECTOR = "a.pageNav-jump--next"
+PAGE_NUMBER_SELECTOR = ".pageNav-page a"
 
 # Post selectors
 POST_SELECTOR = "article.js-post"
@@ -23,31 +37,64 @@ USERNAME_SELECTOR = ".MessageCard__user-info__name"
 BODY_SELECTOR = ".message-body .bbWrapper"
 QUOTE_BLOCK_SELECTOR = "blockquote.bbCodeBlock--quote"
 QUOTE_SOURCE_LINK_SELECTOR = ".bbCodeBlock-sourceJump"
-
+LINK_SELECTOR = "a[href]"
+MEMBER_LINK_SELECTOR = 'a[href*="/members/"]'
+TIME_SELECTOR = "time[datetime]"
+
+# Compiled once here; soup.select(str) would re-resolve the selector string on every call.
+_SEL_THREAD_CARD = sv.compile(THREAD_CARD_SELECTOR)
+_SEL_THREAD_LINK = sv.compile(THREAD_LINK_SELECTOR)
+_SEL_NEXT_PAGE = sv.compile(NEXT_PAGE_SELECTOR)
+_SEL_PAGE_NUMBER = sv.compile(PAGE_NUMBER_SELECTOR)
+_SEL_POST = sv.compile(POST_SELECTOR)
+_SEL_USERNAME = sv.compile(USERNAME_SELECTOR)
+_SEL_BODY = sv.compile(BODY_SELECTOR)
+_SEL_QUOTE_BLOCK = sv.compile(QUOTE_BLOCK_SELECTOR)
+_SEL_QUOTE_SOURCE_LINK = sv.compile(QUOTE_SOURCE_LINK_SELECTOR)
+_SEL_LINK = sv.compile(LINK_SELECTOR)
+_SEL_MEMBER_LINK = sv.compile(MEMBER_LINK_SELECTOR)
+_SEL_TIME = sv.compile(TIME_SELECTOR)
+
+def _class_strainer(*class_names: str) -> SoupStrainer:
+    """Keep only elements carrying one of `class_names` (with their subtrees) while parsing."""
+    # While parsing, the strainer sees the raw class attribute string, not the token list.
+    tokens = "|".join(map(re.escape, class_names))
+    return SoupStrainer(class_=re.compile(rf"(?:^|\s)(?:{tokens})(?:\s|$)"))
+
+# Page chrome (head, nav, sidebars, footer) is most of a page's nodes and none of
+# the selectors above look at it. Keep these in sync with the selectors.
+_THREAD_PAGE_STRAINER = _class_strainer("js-post", "pageNav-jump--next", "pageNav-page")
+_FORUM_PAGE_STRAINER = _class_strainer("structItem--thread", "pageNav-jump--next")
+
+# Per-post regexes, compiled once instead of going through re's pattern cache on every call.
+_TRAILING_DOT_NUM = re.compile(r"\.(\d+)$")
+_ID_TAIL = re.compile(r"(\d+)$")
+_POST_ID_IN_SELECTOR = re.compile(r"post-(\d+)")
+_POST_ID_IN_HREF = re.compile(r"(?:id=|post-)(\d+)")
+_SAID_SUFFIX = re.compile(r"\s*said:?$", re.IGNORECASE)
+
+# The same member/thread/pagination hrefs recur across every page of a scrape.
+@functools.lru_cache(maxsize=8192)
 def absolute_url(href: str) -> str:
     if href.startswith("http"):
         return href
     if href.startswith("/"):
         return BASE_URL + href
-    return BASE_URL + "/" + href.lstrip("/")
-
-def _is_member_link(href: str | None) -> bool:
-    """Return True when href looks like a member profile link."""
-    return bool(href and "/members/" in href)
-
+    # No leading slash here, so there is nothing to lstrip.
+    return _BASE_URL_SLASH + href
 
 def _current_scrape_timestamp() -> str:
-    """Return an ISO8601 timestamp used for row-level bookkeeping."""
-    return datetime.now().isoformat(timespec="seconds") + "Z"
+    """Return an ISO8601 UTC timestamp used for row-level bookkeeping."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 def _thread_id_from_url(thread_url: str) -> str:
     """Derive a stable thread identifier from the thread URL."""
     path = urlparse(thread_url).path.rstrip("/")
-    match = re.search(r"\.(\d+)$", path)
+    match = _TRAILING_DOT_NUM.search(path)
     if match:
         return match.group(1)
-    match = re.search(r"(\d+)$", path)
+    match = _ID_TAIL.search(path)
     if match:
         return match.group(1)
     return hashlib.sha1(thread_url.encode("utf-8", "ignore")).hexdigest()[:16]
@@ -58,12 +105,12 @@ def _parse_post_id_from_quote_link(link) -> str | None:
         return None
     selector = link.get("data-content-selector")
     if selector:
-        match = re.search(r"post-(\d+)", selector)
+        match = _POST_ID_IN_SELECTOR.search(selector)
         if match:
             return match.group(1)
     href = link.get("href")
     if href:
-        match = re.search(r"(?:id=|post-)(\d+)", href)
+        match = _POST_ID_IN_HREF.search(href)
         if match:
             return match.group(1)
     return None
@@ -72,13 +119,13 @@ def _clean_quote_username(raw: str | None) -> str | None:
     if not raw:
         return None
     cleaned = raw.strip()
-    cleaned = re.sub(r"\s*said:?$", "", cleaned, flags=re.IGNORECASE)
+    cleaned = _SAID_SUFFIX.sub("", cleaned)
     return cleaned or None
 
 def _extract_quote_targets(post_div) -> list[dict]:
     quotes: list[dict] = []
-    for block in post_div.select(QUOTE_BLOCK_SELECTOR):
-        link = block.select_one(QUOTE_SOURCE_LINK_SELECTOR)
+    for block in _SEL_QUOTE_BLOCK.select(post_div):
+        link = _SEL_QUOTE_SOURCE_LINK.select_one(block)
         target_post_id = _parse_post_id_from_quote_link(link)
         username = _clean_quote_username(link.get_text(" ", strip=True) if link else None)
         if not target_post_id and not username:
@@ -94,20 +141,19 @@ def _extract_mentions(body_el) -> list[dict]:
     if not body_el:
         return mentions
 
-    seen: set[tuple[str | None, str | None]] = set()
-    for link in body_el.select("a"):
+    # A profile URL identifies the member; repeat links to them are one mention.
+    seen: set[str] = set()
+    # Only member-profile links can be mentions; let the selector skip the rest.
+    for link in _SEL_MEMBER_LINK.select(body_el):
         href = link.get("href")
-        if not href or "/members/" not in href:
-            continue
         classes = link.get("class") or []
         if not link.get("data-user-id") and not any(cls.startswith("username") for cls in classes):
             continue
         profile_url = absolute_url(str(href))
-        username = link.get_text(strip=True) or None
-        key = (profile_url, username)
-        if key in seen:
+        if profile_url in seen:
             continue
-        seen.add(key)
+        seen.add(profile_url)
+        username = link.get_text(strip=True) or None
         mentions.append({
             "profile_url": profile_url,
             "username": username,
@@ -115,28 +161,38 @@ def _extract_mentions(body_el) -> list[dict]:
         })
     return mentions
 
-def get_thread_list(
+def _next_page_url(soup: BeautifulSoup) -> str | None:
+    """Return the absolute URL behind the pagination "next" link, if any."""
+    next_link = _SEL_NEXT_PAGE.select_one(soup)
+    if not next_link:
+        return None
+    next_href = next_link.get("href")
+    if not next_href:
+        return None
+    return absolute_url(str(next_href))
+
+def iter_thread_list(
     forum_url: str,
     max_pages: int | None,
     thread_limit: int | None = 5,
 ):
     """
-    Scrape a forum section index to collect thread URLs.
+    Scrape a forum section index, yielding thread URLs as each index page is read,
+    so callers can start on the first threads while later index pages are pending.
     `max_pages` prevents infinite crawling; increase carefully.
     `thread_limit` stops once N unique threads are gathered (default 5).
     """
     seen = set()
-    ordered_threads: list[str] = []
     page_url = forum_url
     page = 1
 
     while True:
         print(f"[threads] Fetching forum index page {page}: {page_url}")
-        html = fetch(page_url)
-        soup = BeautifulSoup(html, "html.parser")
+        html = fetch_bytes(page_url)
+        soup = BeautifulSoup(html, "lxml", parse_only=_FORUM_PAGE_STRAINER)
 
-        for card in soup.select(THREAD_CARD_SELECTOR):
-            link = card.select_one(THREAD_LINK_SELECTOR)
+        for card in _SEL_THREAD_CARD.select(soup):
+            link = _SEL_THREAD_LINK.select_one(card)
             if not link:
                 continue
             href = link.get("href")
@@ -148,30 +204,32 @@ def get_thread_list(
             if url in seen:
                 continue
             seen.add(url)
-            ordered_threads.append(url)
-            if thread_limit is not None and len(ordered_threads) >= thread_limit:
+            yield url
+            if thread_limit is not None and len(seen) >= thread_limit:
                 break
 
-        if thread_limit is not None and len(ordered_threads) >= thread_limit:
+        if thread_limit is not None and len(seen) >= thread_limit:
             break
             
         if max_pages is not None and page >= max_pages:
             break
 
-        # Find "next page" (if any)
-        next_link = soup.select_one(NEXT_PAGE_SELECTOR)
-        if not next_link:
-            break
-
-        next_href = next_link.get("href")
-        if not next_href:
+        next_url = _next_page_url(soup)
+        if not next_url:
             break
 
-        page_url = absolute_url(str(next_href))
+        page_url = next_url
         page += 1
 
-    print(f"[threads] Collected {len(ordered_threads)} thread URLs.")
-    return ordered_threads
+    print(f"[threads] Collected {len(seen)} thread URLs.")
+
+def get_thread_list(
+    forum_url: str,
+    max_pages: int | None,
+    thread_limit: int | None = 5,
+) -> list[str]:
+    """Collect a forum section's thread URLs up front; see `iter_thread_list`."""
+    return list(iter_thread_list(forum_url, max_pages, thread_limit))
 
 def _extract_post_id(post_div) -> str | None:
     """
@@ -186,7 +244,7 @@ def _extract_post_id(post_div) -> str | None:
     # 2) id with digits
     elem_id = post_div.get("id")
     if elem_id:
-        m = re.search(r"(\d+)$", elem_id)
+        m = _ID_TAIL.search(elem_id)
         if m:
             return m.group(1)
 
@@ -206,29 +264,30 @@ def parse_posts_from_page(soup: BeautifulSoup):
     """
     posts = []
 
-    for post_div in soup.select(POST_SELECTOR):
+    for post_div in _SEL_POST.select(soup):
         # Username
-        user_el = post_div.select_one(USERNAME_SELECTOR)
+        user_el = _SEL_USERNAME.select_one(post_div)
         username = user_el.get_text(strip=True) if user_el else post_div.get("data-author")
 
         # Profile URL
         profile_url = None
         if user_el:
-            link_el = user_el.find("a", href=True)
+            link_el = _SEL_LINK.select_one(user_el)
             if link_el:
                 profile_url = absolute_url(str(link_el["href"]))
         if not profile_url:
             # Fallback: any link to /members/ inside post card
-            link_el = post_div.find("a", href=_is_member_link)
+            link_el = _SEL_MEMBER_LINK.select_one(post_div)
             if link_el and link_el.get("href"):
                 profile_url = absolute_url(str(link_el["href"]))
 
         # Timestamp
-        time_el = post_div.find("time", attrs={"datetime": True}) or post_div.find("time")
+        # First <time> that carries a datetime; a bare <time> would yield None anyway.
+        time_el = _SEL_TIME.select_one(post_div)
         timestamp = time_el.get("datetime") if time_el else None
 
         # Body text
-        body_el = post_div.select_one(BODY_SELECTOR)
+        body_el = _SEL_BODY.select_one(post_div)
         text = body_el.get_text("\n", strip=True) if body_el else None
         quotes = _extract_quote_targets(post_div)
         mentions = _extract_mentions(body_el)
@@ -251,35 +310,37 @@ def parse_posts_from_page(soup: BeautifulSoup):
 def _build_interactions_for_post(
     *,
     thread_id: str,
-    post_row: dict,
+    post_row: PostRow,
     quotes: list[dict],
     mentions: list[dict],
     post_author_index: dict[str, dict],
-) -> list[dict]:
-    interactions: list[dict] = []
-    replying_post_id = post_row.get("post_id")
+) -> list[InteractionRow]:
+    interactions: list[InteractionRow] = []
+    replying_post_id = post_row.post_id
     if not replying_post_id:
         return interactions
 
-    source_user_id = post_row.get("user_id")
-    scraped_at = post_row.get("scraped_at")
+    source_user_id = post_row.user_id
+    scraped_at = post_row.scraped_at
 
+    # Ids are "<replying_post_id>-<n>": post ids are site-wide unique, so this is
+    # unique without a uuid per edge and stable across re-scrapes of the thread.
     for quote in quotes:
         target_post_id = quote.get("target_post_id")
         target_user_id = None
         if target_post_id and target_post_id in post_author_index:
             target_user_id = post_author_index[target_post_id].get("user_id")
-        interactions.append({
-            "interaction_id": str(uuid4()),
-            "replying_post_id": replying_post_id,
-            "target_post_id": target_post_id,
-            "source_user_id": source_user_id,
-            "target_user_id": target_user_id,
-            "thread_id": thread_id,
-            "interaction_type": "quote",
-            "confidence": 1.0,
-            "scraped_at": scraped_at,
-        })
+        interactions.append(InteractionRow(
+            interaction_id=f"{replying_post_id}-{len(interactions) + 1}",
+            replying_post_id=replying_post_id,
+            target_post_id=target_post_id,
+            source_user_id=source_user_id,
+            target_user_id=target_user_id,
+            thread_id=thread_id,
+            interaction_type="quote",
+            confidence=1.0,
+            scraped_at=scraped_at,
+        ))
 
     for mention in mentions:
         profile_url = mention.get("profile_url")
@@ -288,44 +349,149 @@ def _build_interactions_for_post(
             target_user_id = extract_user_id_from_profile_url(profile_url)
         if not target_user_id and not mention.get("username"):
             continue
-        interactions.append({
-            "interaction_id": str(uuid4()),
-            "replying_post_id": replying_post_id,
-            "target_post_id": None,
-            "source_user_id": source_user_id,
-            "target_user_id": target_user_id,
-            "thread_id": thread_id,
-            "interaction_type": "mention",
-            "confidence": 0.7,
-            "scraped_at": scraped_at,
-        })
+        interactions.append(InteractionRow(
+            interaction_id=f"{replying_post_id}-{len(interactions) + 1}",
+            replying_post_id=replying_post_id,
+            target_post_id=None,
+            source_user_id=source_user_id,
+            target_user_id=target_user_id,
+            thread_id=thread_id,
+            interaction_type="mention",
+            confidence=0.7,
+            scraped_at=scraped_at,
+        ))
 
     return interactions
 
+def _predict_page_urls(soup: BeautifulSoup) -> list[str] | None:
+    """
+    Build the URLs of pages 2..N from page 1's pagination widget.
+    XenForo renders the last page number in `.pageNav-page` and page K lives
+    at `.../page-K`, so the whole list is known after one fetch. Returns []
+    for single-page threads and None when the widget can't be read.
+    """
+    next_url = _next_page_url(soup)
+    if not next_url:
+        return []
+    if not next_url.endswith("page-2"):
+        return None
+    page_numbers = [
+        int(text)
+        for text in (link.get_text(strip=True) for link in _SEL_PAGE_NUMBER.select(soup))
+        if text.isdigit()
+    ]
+    if not page_numbers:
+        return None
+    prefix = next_url[:-1]
+    return [f"{prefix}{k}" for k in range(2, max(page_numbers) + 1)]
+
+def _fetch_soup(url: str) -> BeautifulSoup:
+    """Fetch and parse one page; submitted to page pools so parsing runs on the worker too."""
+    return BeautifulSoup(fetch_bytes(url), "lxml", parse_only=_THREAD_PAGE_STRAINER)
+
+def _follow_next_links(page_url: str, soup: BeautifulSoup, max_pages: int | None):
+    """Fallback pager: walk "next" links, prefetching page N+1 while page N is processed."""
+    page = 1
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        while True:
+            next_url = None
+            if max_pages is None or page < max_pages:
+                next_url = _next_page_url(soup)
+            pending = None
+            if next_url:
+                print(f"[scrape-thread] Fetching page {next_url}")
+                pending = prefetcher.submit(_fetch_soup, next_url)
+
+            yield page_url, soup
+
+            if pending is None:
+                return
+            page_url, soup = next_url, pending.result()
+            page += 1
+
+def iter_thread_pages(thread_url: str, max_pages: int | None):
+    """
+    Yield (page_url, soup) for each page of a thread; every page is fetched
+    and parsed exactly once, and the same soup serves pagination and posts.
+    Once page 1 is parsed, the remaining page URLs are predicted from the
+    pagination widget and downloaded + parsed concurrently (up to PAGE_FETCH_WORKERS
+    at a time, a bounded window ahead of the caller), instead of discovering
+    each page from the previous one's "next" link.
+    """
+    print(f"[scrape-thread] Fetching page {thread_url}")
+    soup = _fetch_soup(thread_url)
+
+    page_urls = _predict_page_urls(soup)
+    if page_urls is None:
+        yield from _follow_next_links(thread_url, soup, max_pages)
+        return
+    if max_pages is not None:
+        page_urls = page_urls[: max(max_pages - 1, 0)]
+
+    window = PAGE_FETCH_WORKERS * 2
+    remaining = iter(page_urls)
+    pending: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as fetcher:
+        def top_up() -> None:
+            while len(pending) < window:
+                url = next(remaining, None)
+                if url is None:
+                    return
+                print(f"[scrape-thread] Fetching page {url}")
+                pending.append((url, fetcher.submit(_fetch_soup, url)))
+
+        top_up()
+        try:
+            yield thread_url, soup
+
+            while pending:
+                page_url, future = pending.popleft()
+                top_up()
+                try:
+                    page_soup = future.result()
+                except requests.HTTPError as exc:
+                    # The thread shrank since page 1 was fetched; stop at the gap.
+                    if exc.response is not None and exc.response.status_code == 404:
+                        print(f"[scrape-thread] {page_url} no longer exists, stopping")
+                        break
+                    raise
+                yield page_url, page_soup
+        finally:
+            # Stopped early (close(), an error or a missing page): don't fetch
+            # the pages still queued; the pool then waits only for running ones.
+            for _, future in pending:
+                future.cancel()
+
 def scrape_thread(
     thread_url: str,
-    user_cache: dict[str, dict],
+    user_cache: MutableMapping[str, dict],
     max_pages: int | None,
     forum_url: str | None = None,
+    on_posts: Callable[[list[PostRow]], None] | None = None,
 ):
     """
     Scrape all posts in a thread, enrich with user metadata, and derive interactions.
-    Returns (posts, interactions, thread_row).
+    Returns (posts, interactions, thread_row, users), where `users` maps the
+    user_id of each of this thread's authors found in `user_cache` to its record.
+    With `on_posts`, each page's rows are handed over as soon as the page is done
+    and not kept (`posts` comes back empty), so long threads never hold all of
+    their post text in memory.
     """
-    all_posts: list[dict] = []
-    interactions: list[dict] = []
+    all_posts: list[PostRow] = []
+    users: dict[str, dict] = {}
     post_author_index: dict[str, dict] = {}
+    post_links: list[tuple[PostRow, list[dict], list[dict]]] = []
     thread_id = _thread_id_from_url(thread_url)
     thread_scrape_ts = _current_scrape_timestamp()
 
-    page_url = thread_url
-    page = 1
-
-    while True:
-        print(f"[scrape-thread] Fetching page {page_url}")
-        html = fetch(page_url)
-        soup = BeautifulSoup(html, "html.parser")
+    for page_url, soup in iter_thread_pages(thread_url, max_pages):
         page_posts = parse_posts_from_page(soup)
+        # Fetch this page's new authors side by side rather than one post at a time.
+        fetch_users((p.get("profile_url") for p in page_posts), user_cache)
+        # One bookkeeping timestamp per page; second resolution makes per-post calls moot.
+        scraped_at = _current_scrape_timestamp()
+        page_rows: list[PostRow] = []
 
         for p in page_posts:
             profile_url = p.get("profile_url")
@@ -338,6 +504,7 @@ def scrape_thread(
                 user = get_or_fetch_user(profile_url, user_cache)
                 if user:
                     user_id = user["user_id"]
+                    users[user_id] = user
                     # Prefer canonical username from profile if present
                     if user.get("username"):
                         username = user["username"]
@@ -345,55 +512,109 @@ def scrape_thread(
                     # fallback: derive from URL
                     user_id = extract_user_id_from_profile_url(profile_url)
 
-            scraped_at = _current_scrape_timestamp()
             post_id = p.get("post_id")
-            post_row = {
-                "thread_id": thread_id,
-                "thread_url": thread_url,
-                "page_url": page_url,
-                "post_id": post_id,
-                "user_id": user_id,
-                "username": username,
-                "timestamp": p.get("timestamp"),
-                "text": p.get("text"),
-                "scraped_at": scraped_at,
-            }
-            all_posts.append(post_row)
+            post_row = PostRow(
+                thread_id=thread_id,
+                thread_url=thread_url,
+                page_url=page_url,
+                post_id=post_id,
+                user_id=user_id,
+                username=username,
+                timestamp=p.get("timestamp"),
+                text=p.get("text"),
+                scraped_at=scraped_at,
+            )
+            page_rows.append(post_row)
             if post_id:
-                post_author_index[post_id] = {
+                author = {
                     "user_id": user_id,
                     "username": username,
                 }
-
-            interactions.extend(
-                _build_interactions_for_post(
-                    thread_id=thread_id,
-                    post_row=post_row,
-                    quotes=quotes,
-                    mentions=mentions,
-                    post_author_index=post_author_index,
-                )
+                post_author_index[post_id] = author
+                # Quote links name the bare number ("#post-123" -> "123") while
+                # post_id keeps data-content's "post-123"; index both spellings.
+                number = _ID_TAIL.search(post_id)
+                if number:
+                    post_author_index[number.group(1)] = author
+            if quotes or mentions:
+                # Interactions only need the ids, not the (possibly long) text.
+                post_links.append((post_row._replace(text=None), quotes, mentions))
+
+        if on_posts is not None:
+            on_posts(page_rows)
+        else:
+            all_posts.extend(page_rows)
+
+    # Second pass, once the index covers every page: quotes of posts that come
+    # later in the thread resolve too.
+    interactions: list[InteractionRow] = []
+    for post_row, quotes, mentions in post_links:
+        interactions.extend(
+            _build_interactions_for_post(
+                thread_id=thread_id,
+                post_row=post_row,
+                quotes=quotes,
+                mentions=mentions,
+                post_author_index=post_author_index,
             )
-
-        if max_pages is not None and page >= max_pages:
-            break
-
-        next_link = soup.select_one(NEXT_PAGE_SELECTOR)
-        if not next_link:
-            break
-        next_href = next_link.get("href")
-        if not next_href:
-            break
-
-        page_url = absolute_url(str(next_href))
-        page += 1
-
-    thread_row = {
-        "thread_id": thread_id,
-        "thread_url": thread_url,
-        "forum_url": forum_url,
-        "first_seen": thread_scrape_ts,
-        "last_seen": thread_scrape_ts,
-        "scraped_at": thread_scrape_ts,
-    }
-    return all_posts, interactions, thread_row
+        )
+
+    thread_row = ThreadRow(
+        thread_id=thread_id,
+        thread_url=thread_url,
+        forum_url=forum_url,
+        first_seen=thread_scrape_ts,
+        last_seen=thread_scrape_ts,
+        scraped_at=thread_scrape_ts,
+    )
+    return all_posts, interactions, thread_row, users
+
+def _scrape_thread_safely(thread_url: str, **kwargs):
+    try:
+        return scrape_thread(thread_url, **kwargs), None
+    except Exception as exc:  # noqa: BLE001 - reported per thread by the caller
+        return None, exc
+
+def scrape_threads(
+    thread_urls,
+    user_cache: MutableMapping[str, dict],
+    max_pages: int | None,
+    forum_url: str | None = None,
+    max_workers: int = DEFAULT_THREAD_WORKERS,
+    on_posts: Callable[[list[PostRow]], None] | None = None,
+):
+    """
+    Scrape many threads concurrently on a worker pool.
+    Yields (thread_url, result, error) in input order, where `result` is the
+    `scrape_thread` tuple or None when `error` holds the raised exception.
+    At most `2 * max_workers` threads are in flight so results don't pile up
+    faster than the caller writes them out. `on_posts` is passed on to every
+    `scrape_thread` call and runs on the worker threads, so it must be thread-safe.
+    Closing the generator early cancels the threads that haven't started yet.
+    """
+    window = max(1, max_workers) * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque = deque()
+        try:
+            for thread_url in thread_urls:
+                future = executor.submit(
+                    _scrape_thread_safely,
+                    thread_url,
+                    user_cache=user_cache,
+                    max_pages=max_pages,
+                    forum_url=forum_url,
+                    on_posts=on_posts,
+                )
+                pending.append((thread_url, future))
+                if len(pending) >= window:
+                    done_url, done = pending.popleft()
+                    yield (done_url, *done.result())
+
+            while pending:
+                done_url, done = pending.popleft()
+                yield (done_url, *done.result())
+        finally:
+            # The caller stopped early (close() or an error): don't start the
+            # threads still queued; the pool then waits only for running ones.
+            for _, future in pending:
+                future.cancel()
@@ -1,49 +1,87 @@
+import threading
 import time
 import requests
 
 from collections import deque
 from typing import Optional
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 class RateLimiter:
     """
     Allow up to `max_calls` every `period` seconds.
     Example: max_calls=10, period=60 => 10 requests/minute.
+    Safe to share between worker threads: callers queue up on the lock.
     """
     def __init__(self, max_calls: int, period: float):
         self.max_calls = max_calls
         self.period = period
         self.calls = deque()
+        self._lock = threading.Lock()
 
     def wait(self):
-        now = time.time()
-        while self.calls and self.calls[0] <= now - self.period:
-            self.calls.popleft()
+        # monotonic, not time.time(): a wall-clock jump (NTP, DST) must not
+        # stretch or skip the window.
+        with self._lock:
+            now = time.monotonic()
+            cutoff = now - self.period
+            while self.calls and self.calls[0] <= cutoff:
+                self.calls.popleft()
+
+            if len(self.calls) >= self.max_calls:
+                sleep_for = self.calls[0] + self.period - now
+                if sleep_for > 0:
+                    print(f"[rate-limiter] Sleeping {sleep_for:.2f}s to respect rate limit...")
+                    time.sleep(sleep_for)
+            self.calls.append(time.monotonic())
 
-        if len(self.calls) >= self.max_calls:
-            sleep_for = self.period - (now - self.calls[0])
-            if sleep_for > 0:
-                print(f"[rate-limiter] Sleeping {sleep_for:.2f}s to respect rate limit...")
-                time.sleep(sleep_for)
-        self.calls.append(time.time())
+# Keep-alive connections are pooled per host; size the pool for the thread
+# workers + page prefetchers so concurrent fetches don't drop connections.
+HTTP_POOL_SIZE = 32
 
 SESSION = requests.Session()
 SESSION.headers.update({
     "User-Agent": "Farhan-ResearchBot/0.1 (+https://github.com/farhan-navas; contact: farhanmnavas@gmail.com)",
 })
+# Retries stay in `_get`, which knows about 429/Retry-After and goes through the
+# rate limiter again. Retry(0, read=False) is requests' own default, spelled out;
+# without read=False a read timeout would surface as ConnectionError instead of
+# ReadTimeout.
+_adapter = HTTPAdapter(
+    pool_connections=HTTP_POOL_SIZE,
+    pool_maxsize=HTTP_POOL_SIZE,
+    max_retries=Retry(total=0, read=False),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
 DEFAULT_MAX_CALLS = 1
 DEFAULT_PERIOD = 2.0
+# Cap on requests on the wire at once, across every worker thread. The rate
+# limiter only spaces out request *starts*; this bounds how many slow
+# responses can pile up (and how many pooled connections we hold) at a time.
+DEFAULT_MAX_IN_FLIGHT = 20
 _limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(DEFAULT_MAX_IN_FLIGHT)
 
-def configure_rate_limiter(max_calls: int = DEFAULT_MAX_CALLS, period: float = DEFAULT_PERIOD) -> None:
+def configure_rate_limiter(
+    max_calls: int = DEFAULT_MAX_CALLS,
+    period: float = DEFAULT_PERIOD,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+) -> None:
     """Set global rate limiter configuration before issuing requests."""
-    global _limiter
+    global _limiter, _in_flight
     _limiter = RateLimiter(max_calls=max_calls, period=period)
+    _in_flight = threading.BoundedSemaphore(max_in_flight)
 
 def _get_limiter() -> RateLimiter:
     global _limiter
     if _limiter is None:
-        configure_rate_limiter()
+        with _limiter_lock:
+            if _limiter is None:
+                configure_rate_limiter()
     assert _limiter is not None
     return _limiter
 
@@ -52,10 +90,22 @@ def fetch(url: str, max_retries: int = 3) -> str:
     Rate-limited GET with basic retry + 429/5xx backoff.
     Returns HTML text or raises the last exception.
     """
+    return _get(url, max_retries).text
+
+def fetch_bytes(url: str, max_retries: int = 3) -> bytes:
+    """
+    Same as `fetch`, but returns the raw response body.
+    lxml decodes bytes itself (using the page's <meta charset>), so handing it
+    the body directly skips building an intermediate str of the whole page.
+    """
+    return _get(url, max_retries).content
+
+def _get(url: str, max_retries: int) -> requests.Response:
     for attempt in range(1, max_retries + 1):
         _get_limiter().wait()
         try:
-            resp = SESSION.get(url, timeout=15)
+            with _in_flight:
+                resp = SESSION.get(url, timeout=15)
         except requests.RequestException as e:
             print(f"[fetch] Error on {url}: {e} (attempt {attempt}/{max_retries})")
             if attempt == max_retries:
@@ -83,6 +133,6 @@ def fetch(url: str, max_retries: int = 3) -> str:
             continue
 
         resp.raise_for_status()
-        return resp.text
+        return resp
 
     raise RuntimeError(f"Failed to fetch {url} after {max_retries} attempts.")
@@ -0,0 +1,310 @@
+"""Scrape drivers shared by the run_*.py entry points."""
+
+import csv
+import functools
+import logging
+import queue
+import re
+import sys
+import threading
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from urllib.parse import urlparse
+
+import orjson
+
+from scraper.data_model import (
+    CSV_BUFFER_SIZE,
+    INTERACTIONS_FIELDNAMES,
+    POSTS_FIELDNAMES,
+    THREADS_FIELDNAMES,
+    USERS_FIELDNAMES,
+)
+from scraper.post_scraper import (
+    DEFAULT_THREAD_WORKERS,
+    iter_thread_list,
+    scrape_thread,
+    scrape_threads,
+)
+from scraper.user_cache import DEFAULT_USER_CACHE_PATH, UserCache
+
+_SLUG_STRIP = re.compile(r"\.\d+$")
+_NEEDS_QUOTING = re.compile(r'[",\r\n]')
+# Scraped threads waiting for the CSV writer thread; bounds memory if disk lags.
+_WRITER_QUEUE_SIZE = 64
+POSTS_FORMATS = ("csv", "ndjson")
+
+@functools.lru_cache(maxsize=1024)
+def _slug_from_url(url: str) -> str:
+    path = urlparse(url).path.strip("/")
+    if not path:
+        return "forums"
+    tail = path.split("/")[-1]
+    cleaned = _SLUG_STRIP.sub("", tail)
+    return cleaned or "forums"
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Show scraper log records (e.g. [user] fallbacks) as bare lines on stdout,
+    interleaved with the [main]/[fetch]/[rate-limiter] prints.
+    """
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stdout)
+
+def _open_user_cache(path: Path | None):
+    """Persistent UserCache at `path`, or a throwaway dict when path is None."""
+    if path is None:
+        return nullcontext({})
+    return UserCache(path)
+
+def _csv_field(value) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        return str(value)
+    if _NEEDS_QUOTING.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _format_csv_rows(rows) -> str:
+    """
+    Render tuple rows exactly as csv.writer's default dialect would (minimal
+    quoting, CRLF line endings), as one string. Post rows are dominated by the
+    long `text` column, which csv.writer scans char by char; one regex search
+    per field plus a single write() per thread is noticeably cheaper.
+    """
+    return "".join(",".join([_csv_field(value) for value in row]) + "\r\n" for row in rows)
+
+class _CsvOutputs:
+    """
+    Open the output CSVs for one run and append `scrape_thread` results to them.
+    Files are named `<table><suffix>.csv` inside `output_dir`; the threads and
+    interactions tables can be switched off. With posts_format="ndjson" posts
+    go to `posts<suffix>.ndjson` instead, one JSON object per line.
+    """
+    def __init__(
+        self,
+        output_dir: Path,
+        suffix: str = "",
+        *,
+        emit_threads: bool = True,
+        emit_interactions: bool = True,
+        posts_format: str = "csv",
+    ):
+        if posts_format not in POSTS_FORMATS:
+            raise ValueError(f"posts_format must be one of {POSTS_FORMATS}, got {posts_format!r}")
+        self.posts_format = posts_format
+        self.posts_path = output_dir / f"posts{suffix}.{posts_format}"
+        self.users_path = output_dir / f"users{suffix}.csv"
+        self.interactions_path = output_dir / f"interactions{suffix}.csv" if emit_interactions else None
+        self.threads_path = output_dir / f"threads{suffix}.csv" if emit_threads else None
+        self._stack = ExitStack()
+        self._written_user_ids: set[str] = set()
+
+    def _open(self, path: Path):
+        return self._stack.enter_context(
+            open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE)
+        )
+
+    def __enter__(self):
+        self.posts_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.posts_format == "ndjson":
+            self.posts_f = self._stack.enter_context(
+                open(self.posts_path, "wb", buffering=CSV_BUFFER_SIZE)
+            )
+        else:
+            self.posts_f = self._open(self.posts_path)
+            self.posts_f.write(_format_csv_rows([POSTS_FIELDNAMES]))
+
+        self.interactions_f = None
+        if self.interactions_path is not None:
+            self.interactions_f = self._open(self.interactions_path)
+            self.interactions_f.write(_format_csv_rows([INTERACTIONS_FIELDNAMES]))
+
+        self.threads_f = None
+        if self.threads_path is not None:
+            self.threads_f = self._open(self.threads_path)
+            self.threads_f.write(_format_csv_rows([THREADS_FIELDNAMES]))
+
+        self.users_writer = csv.DictWriter(self._open(self.users_path), fieldnames=USERS_FIELDNAMES)
+        self.users_writer.writeheader()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    @property
+    def paths(self) -> list[Path]:
+        candidates = [self.posts_path, self.users_path, self.interactions_path, self.threads_path]
+        return [path for path in candidates if path is not None]
+
+    def write_posts(self, posts) -> None:
+        if not posts:
+            return
+        if self.posts_format == "ndjson":
+            # orjson escapes the long `text` column in C; no per-char scan here.
+            self.posts_f.write(b"".join(orjson.dumps(post._asdict()) + b"\n" for post in posts))
+        else:
+            self.posts_f.write(_format_csv_rows(posts))
+
+    def write_result(self, result) -> None:
+        posts, interactions, thread_row, thread_users = result
+
+        self.write_posts(posts)
+        if self.interactions_f is not None:
+            self.interactions_f.write(_format_csv_rows(interactions))
+        if self.threads_f is not None:
+            self.threads_f.write(_format_csv_rows([thread_row]))
+
+        # Write the records the scrape resolved, not fresh cache lookups: a
+        # TTL cache may have expired them by the time the writer gets here.
+        new_users = {
+            user_id: user
+            for user_id, user in thread_users.items()
+            if user_id and user_id not in self._written_user_ids
+        }
+        self.users_writer.writerows(new_users.values())
+        self._written_user_ids.update(new_users)
+
+def _drain(
+    pending: queue.Queue,
+    outputs: _CsvOutputs,
+    errors: list[BaseException],
+    failed: threading.Event,
+) -> None:
+    """
+    Writer-thread loop: write queued items until the None sentinel. Items are
+    ("posts", rows) for one page streamed by a worker, or ("thread", result)
+    once a whole thread is done. The first write error is stored in `errors`
+    and sets `failed`, so the producers can stop scraping.
+    """
+    while (item := pending.get()) is not None:
+        if failed.is_set():
+            continue  # keep draining so the producers never block on a full queue
+        kind, payload = item
+        try:
+            if kind == "posts":
+                outputs.write_posts(payload)
+            else:
+                outputs.write_result(payload)
+        except BaseException as exc:  # noqa: BLE001 - re-raised on the main thread
+            errors.append(exc)
+            failed.set()
+
+def run_forum(
+    forum_url: str,
+    *,
+    forum_name: str | None = None,
+    output_dir: Path = Path("data"),
+    max_forum_pages: int | None = None,
+    thread_limit: int | None = None,
+    thread_page_limit: int | None = None,
+    max_workers: int = DEFAULT_THREAD_WORKERS,
+    emit_threads: bool = True,
+    emit_interactions: bool = True,
+    posts_format: str = "csv",
+    user_cache_path: Path | None = DEFAULT_USER_CACHE_PATH,
+) -> None:
+    """
+    Scrape every thread of one forum into `<output_dir>/<table>-<forum slug>.csv`.
+    User profiles are cached in `user_cache_path` across runs (None disables it).
+    """
+    forum_name = forum_name or forum_url
+    print(f"[main] Scraping forum '{forum_name}' ({forum_url})")
+
+    # Threads are handed to the pool as index pages are read rather than after
+    # the whole listing, so scraping starts after the first index page.
+    thread_urls = iter_thread_list(
+        forum_url,
+        max_pages=max_forum_pages,
+        thread_limit=thread_limit,
+    )
+
+    outputs = _CsvOutputs(
+        output_dir,
+        f"-{_slug_from_url(forum_url)}",
+        emit_threads=emit_threads,
+        emit_interactions=emit_interactions,
+        posts_format=posts_format,
+    )
+    with _open_user_cache(user_cache_path) as user_cache, outputs:
+        # Formatting and writing happen on a dedicated thread so this loop can
+        # go straight back to pulling results (and topping up the worker pool).
+        pending: queue.Queue = queue.Queue(maxsize=_WRITER_QUEUE_SIZE)
+        write_errors: list[BaseException] = []
+        write_failed = threading.Event()
+        writer = threading.Thread(
+            target=_drain,
+            args=(pending, outputs, write_errors, write_failed),
+            name="csv-writer",
+            daemon=True,
+        )
+        writer.start()
+
+        def on_posts(rows) -> None:
+            # Posts go to disk page by page instead of a whole thread at a time.
+            # Once the writer has failed, abort the worker's thread at its next page.
+            if write_failed.is_set():
+                raise RuntimeError("output writer failed, abandoning thread")
+            pending.put(("posts", rows))
+
+        results = scrape_threads(
+            thread_urls,
+            user_cache,
+            max_pages=thread_page_limit,
+            forum_url=forum_url,
+            max_workers=max_workers,
+            on_posts=on_posts,
+        )
+        try:
+            for i, (t_url, result, error) in enumerate(results, start=1):
+                if write_failed.is_set():
+                    print("[main] Output writer failed, stopping the scrape")
+                    break
+                if error is not None:
+                    print(f"[main] Error scraping {t_url}: {error}")
+                    continue
+                print(f"[main] ({i}) Scraped thread: {t_url}")
+                pending.put(("thread", result))
+        finally:
+            # Cancels the queued threads and waits for the running ones, whose
+            # pages may still be queued for the writer, before the sentinel.
+            results.close()
+            pending.put(None)
+            writer.join()
+        if write_errors:
+            raise write_errors[0]
+
+    print(
+        f"[main] Finished forum '{forum_name}'. Outputs: "
+        + ", ".join(str(path) for path in outputs.paths)
+    )
+
+def run_thread(
+    thread_url: str,
+    *,
+    output_dir: Path = Path("."),
+    max_pages: int | None = None,
+    emit_threads: bool = True,
+    emit_interactions: bool = True,
+    posts_format: str = "csv",
+    user_cache_path: Path | None = DEFAULT_USER_CACHE_PATH,
+) -> None:
+    """Scrape a single thread into `<output_dir>/<table>.csv`."""
+    outputs = _CsvOutputs(
+        output_dir,
+        emit_threads=emit_threads,
+        emit_interactions=emit_interactions,
+        posts_format=posts_format,
+    )
+    with _open_user_cache(user_cache_path) as user_cache, outputs:
+        print(f"[thread-runner] Scraping {thread_url} (max_pages={max_pages})")
+        result = scrape_thread(
+            thread_url,
+            user_cache,
+            max_pages=max_pages,
+            on_posts=outputs.write_posts,
+        )
+        outputs.write_result(result)
+
+    print("[thread-runner] Done. Wrote " + ", ".join(str(path) for path in outputs.paths))
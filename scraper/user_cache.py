@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+from pathlib import Path
+
+import orjson
+
+DEFAULT_USER_CACHE_PATH = Path("cache") / "users.sqlite3"
+# Profiles barely change within a scrape window; refetch them after a week.
+DEFAULT_USER_CACHE_TTL = 7 * 24 * 60 * 60
+# Recently used records kept as live dicts in front of SQLite.
+DEFAULT_MEMORY_ENTRIES = 4096
+
+class UserCache(MutableMapping):
+    """
+    Drop-in for the in-memory {user_id: user_dict} cache, stored in SQLite so
+    profiles fetched by one run are reused by the next (and by other forum
+    processes). Entries older than `ttl` seconds read as missing, so they get
+    refetched and overwritten. Lookups hit a small in-memory LRU first, then
+    SQLite. Safe to share between worker threads.
+    """
+    def __init__(
+        self,
+        path: Path = DEFAULT_USER_CACHE_PATH,
+        ttl: float | None = DEFAULT_USER_CACHE_TTL,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._memory_entries = memory_entries
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL lets the forum processes read while one of them writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "user_id TEXT PRIMARY KEY, record TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else 0.0
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _remember(self, user_id: str, fetched_at: float, user: dict) -> None:
+        # Caller holds self._lock.
+        self._memory[user_id] = (fetched_at, user)
+        self._memory.move_to_end(user_id)
+        if len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, user_id: str) -> dict | None:
+        cutoff = self._cutoff()
+        with self._lock:
+            hit = self._memory.get(user_id)
+            if hit is not None and hit[0] >= cutoff:
+                self._memory.move_to_end(user_id)
+                return hit[1]
+
+            row = self._conn.execute(
+                "SELECT record, fetched_at FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None or row[1] < cutoff:
+                return None
+            user = orjson.loads(row[0])
+            self._remember(user_id, row[1], user)
+            return user
+
+    def __getitem__(self, user_id: str) -> dict:
+        user = self._lookup(user_id)
+        if user is None:
+            raise KeyError(user_id)
+        return user
+
+    def __contains__(self, user_id) -> bool:
+        return self._lookup(user_id) is not None
+
+    def __setitem__(self, user_id: str, user: dict) -> None:
+        fetched_at = time.time()
+        record = orjson.dumps(user).decode()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (user_id, record, fetched_at) VALUES (?, ?, ?)",
+                (user_id, record, fetched_at),
+            )
+            self._remember(user_id, fetched_at, user)
+
+    def __delitem__(self, user_id: str) -> None:
+        with self._lock, self._conn:
+            self._memory.pop(user_id, None)
+            deleted = self._conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,)).rowcount
+        if not deleted:
+            raise KeyError(user_id)
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._query("SELECT user_id FROM users WHERE fetched_at >= ?", (self._cutoff(),))
+        return (user_id for (user_id,) in rows)
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM users WHERE fetched_at >= ?", (self._cutoff(),))[0][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,17 +1,86 @@
+import functools
+import logging
 import re
+import threading
+import time
 
-from datetime import datetime
+from collections.abc import Iterable, Iterator, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from urllib.parse import urlparse
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from scraper.rate_limiter import fetch
 
+logger = logging.getLogger(__name__)
+
+_USER_ID_DOT_RE = re.compile(r'\.(\d+)/?$')
+_USER_ID_TAIL_RE = re.compile(r'/(\d+)/?$')
+# Every byte except ASCII 0-9, deleted by bytes.translate in _clean_int.
+_NON_DIGIT_BYTES = bytes(c for c in range(256) if not 0x30 <= c <= 0x39)
+_FROM_RE = re.compile(r"from\s+(.*)", re.IGNORECASE)
+_LABEL_WS_RE = re.compile(r"[:\s]+")
+_LABEL_STRIP_RE = re.compile(r"[^a-z0-9 ]")
+
+# Profile/about/tooltip selectors, compiled once rather than on every select() call.
+_SEL_LOCATION_LINK = sv.compile(".memberHeader-blurb a[href*='location-info']")
+_SEL_BLURB = sv.compile(".memberHeader-blurb")
+_SEL_ABOUT_ROW = sv.compile(".flex-row")
+_SEL_ABOUT_LABEL = sv.compile(".about-identifier")
+_SEL_ABOUT_CONTENT = sv.compile(".about-content")
+_SEL_ABOUT_CUSTOM_CONTENT = sv.compile(".about-custom-content")
+_SEL_TITLE = sv.compile("h1.p-title-value")
+_SEL_HEADER_TITLE = sv.compile(".memberHeader-title")
+_SEL_HEADER_USERNAME = sv.compile(".memberHeader-content .username")
+_SEL_HEADER_ROLE = sv.compile(".memberHeader-content .userTitle")
+_SEL_ROLE = sv.compile(".userTitle")
+_SEL_HEADER_TIME = sv.compile(".memberHeader-content time")
+_SEL_DATE_CREATED = sv.compile('time[itemprop="dateCreated"]')
+_SEL_STATS_PAIRS = sv.compile("dl.pairs")
+_SEL_TOOLTIP = sv.compile(".memberTooltip")
+_SEL_TOOLTIP_USERNAME = sv.compile(".memberTooltip-name a.username")
+_SEL_TOOLTIP_TIME = sv.compile(".memberTooltip-blurb time")
+_SEL_TOOLTIP_STATS = sv.compile(".memberTooltip-stats dl")
+
+# Profiles fetched side by side by `fetch_users`; requests still share the rate limiter.
+USER_FETCH_WORKERS = 4
+
+# One long-lived pool for the About tab downloads that `fetch_user_profile` starts
+# alongside each profile page, instead of a throwaway executor per profile. All
+# requests queue on the same rate limiter, so a few threads are plenty.
+_ABOUT_FETCHER = ThreadPoolExecutor(max_workers=USER_FETCH_WORKERS, thread_name_prefix="about-tab")
+
+# Likewise one pool for `fetch_users`, shared by every page of every thread. Its
+# tasks only ever wait on `_ABOUT_FETCHER`, never on this pool, so they can't
+# deadlock waiting for a slot here.
+_USER_FETCHER = ThreadPoolExecutor(max_workers=USER_FETCH_WORKERS, thread_name_prefix="user-fetch")
+
+# One lock per user_id being fetched, so concurrent thread workers don't fetch the
+# same profile twice. Entries are (lock, holder + waiter count) and are dropped once
+# nobody needs them, so the dict only ever holds the in-progress fetches.
+_fetch_locks: dict[str, tuple[threading.Lock, int]] = {}
+_fetch_locks_guard = threading.Lock()
+
+# (epoch second, ISO string) of the last scraped_at handed out.
+_scrape_timestamp: tuple[int, str] = (-1, "")
+
+def _now_iso() -> str:
+    """UTC scraped_at stamp, formatted at most once per second."""
+    global _scrape_timestamp
+    now = int(time.time())
+    second, stamp = _scrape_timestamp
+    if second != now:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _scrape_timestamp = (now, stamp)
+    return stamp
 
 def _safe_text(element) -> str | None:
     if not element:
         return None
     return element.get_text(" ", strip=True)
 
+@functools.lru_cache(maxsize=4096)
 def extract_user_id_from_profile_url(profile_url: str) -> str | None:
     """
     Extract a stable user_id from a XenForo-style member URL.
@@ -23,15 +92,23 @@ def extract_user_id_from_profile_url(profile_url: str) -> str | None:
     if not profile_url:
         return None
 
+    # Fast path for the usual /members/name.12345/ shape: string ops only, no
+    # urlparse or regex. Query strings, ;params, fragments and odd paths go the slow way.
+    if "/members/" in profile_url and not any(c in profile_url for c in "?#;"):
+        trimmed = profile_url[:-1] if profile_url.endswith("/") else profile_url
+        tail = trimmed[trimmed.rfind(".") + 1:]
+        if tail.isdecimal():
+            return tail
+
     path = urlparse(profile_url).path
 
     # Typical XenForo: /members/username.12345/
-    m = re.search(r'\.(\d+)/?$', path)
+    m = _USER_ID_DOT_RE.search(path)
     if m:
         return m.group(1)
 
     # Fallback: last group of digits in path
-    m = re.search(r'/(\d+)/?$', path)
+    m = _USER_ID_TAIL_RE.search(path)
     if m:
         return m.group(1)
 
@@ -40,7 +117,10 @@ def extract_user_id_from_profile_url(profile_url: str) -> str | None:
 def _clean_int(value: str | None) -> int | None:
     if not value:
         return None
-    digits = re.sub(r"[^0-9]", "", value)
+    if value.isascii() and value.isdigit():
+        return int(value)
+    # Keep only ASCII digits ("1,234" -> 1234), like the old [^0-9] regex.
+    digits = value.encode("ascii", "ignore").translate(None, _NON_DIGIT_BYTES)
     return int(digits) if digits else None
 
 def _as_string(value):
@@ -56,8 +136,17 @@ def _as_string(value):
 def _collect_stats(pairs: list) -> dict[str, str]:
     stats: dict[str, str] = {}
     for dl in pairs:
-        dt = dl.find("dt")
-        dd = dl.find("dd")
+        # Stat lists are <dl><dt>label</dt><dd>value</dd></dl>; one pass over the
+        # direct children is far cheaper than two find() calls. Odd markup with
+        # nested dt/dd still falls back to searching the subtree.
+        dt = dd = None
+        for child in dl.children:
+            if child.name == "dt":
+                dt = dt or child
+            elif child.name == "dd":
+                dd = dd or child
+        dt = dt or dl.find("dt")
+        dd = dd or dl.find("dd")
         if not dt or not dd:
             continue
         label = dt.get_text(strip=True).lower()
@@ -65,6 +154,7 @@ def _collect_stats(pairs: list) -> dict[str, str]:
         stats[label] = value
     return stats
 
+@functools.lru_cache(maxsize=4096)
 def _fallback_username(profile_url: str) -> str | None:
     path = urlparse(profile_url).path.rstrip("/")
     if "." in path:
@@ -72,18 +162,28 @@ def _fallback_username(profile_url: str) -> str | None:
     return path.split("/")[-1] or None
 
 def _extract_location_from_header(soup: BeautifulSoup) -> str | None:
-    link = soup.select_one(".memberHeader-blurb a[href*='location-info']")
+    link = _SEL_LOCATION_LINK.select_one(soup)
     if link:
         return link.get_text(strip=True)
 
-    blurb = soup.select_one(".memberHeader-blurb")
+    blurb = _SEL_BLURB.select_one(soup)
     if not blurb:
         return None
 
     text = blurb.get_text(" ", strip=True)
-    match = re.search(r"from\s+(.*)", text, re.IGNORECASE)
+    match = _FROM_RE.search(text)
     return match.group(1).strip(" .") if match else None
 
+# (record field, lowercased stat label) in USERS_FIELDNAMES order.
+_STAT_FIELDS = (
+    ("replies", "replies"),
+    ("discussions_created", "discussions created"),
+    ("reaction_score", "reaction score"),
+    ("points", "points"),
+    ("media_count", "media"),
+    ("showcase_count", "showcase"),
+)
+
 def _build_user_record(
     *,
     user_id: str | None,
@@ -100,12 +200,8 @@ def _build_user_record(
     socionics: str | None = None,
     occupation: str | None = None,
 ) -> dict:
-    def stat_value(label: str) -> int | None:
-        return _clean_int(stats.get(label))
-
-    scraped_at = datetime.now().isoformat(timespec="seconds") + "Z"
-
-    return {
+    get_stat = stats.get
+    record = {
         "user_id": user_id,
         "username": username or _fallback_username(profile_url),
         "profile_url": profile_url,
@@ -118,65 +214,64 @@ def _build_user_record(
         "enneagram_type": enneagram_type,
         "socionics": socionics,
         "occupation": occupation,
-        "replies": stat_value("replies"),
-        "discussions_created": stat_value("discussions created"),
-        "reaction_score": stat_value("reaction score"),
-        "points": stat_value("points"),
-        "media_count": stat_value("media"),
-        "showcase_count": stat_value("showcase"),
-        "scraped_at": scraped_at,
     }
+    for field, label in _STAT_FIELDS:
+        record[field] = _clean_int(get_stat(label))
+    record["scraped_at"] = _now_iso()
+    return record
 
 def _has_meaningful_profile_data(user: dict) -> bool:
-    metric_keys = [
-        "replies",
-        "discussions_created",
-        "reaction_score",
-        "points",
-        "media_count",
-        "showcase_count",
-    ]
-    if any(user.get(k) is not None for k in metric_keys):
+    if any(user.get(field) is not None for field, _ in _STAT_FIELDS):
         return True
     return bool(user.get("join_date") or user.get("role"))
 
+def _label_key(raw: str) -> str:
+    cleaned = _LABEL_WS_RE.sub(" ", raw.lower()).strip()
+    return _LABEL_STRIP_RE.sub("", cleaned)
+
+# The About tab only ever shows a handful of distinct labels, so each one is
+# normalised and matched once per process instead of once per row.
+@functools.lru_cache(maxsize=256)
+def _about_field(raw_label: str) -> str | None:
+    """Map an About-tab label to the user record field it fills, or None."""
+    key_hint = _label_key(raw_label)
+    if key_hint.startswith("location"):
+        return "location"
+    if key_hint.startswith("gender"):
+        return "gender"
+    if "myers briggs" in key_hint or key_hint == "mbti" or "type indicator" in key_hint:
+        return "mbti_type"
+    if "enneagram" in key_hint:
+        return "enneagram_type"
+    if "country of birth" in key_hint:
+        return "country_of_birth"
+    if "socionics" in key_hint:
+        return "socionics"
+    if "occupation" in key_hint:
+        return "occupation"
+    return None
+
 def parse_user_about_page(html: str) -> dict[str, str | None]:
     """Extract optional demographic/profile fields from the About tab."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
     details: dict[str, str | None] = {}
 
-    def _label_key(raw: str) -> str:
-        cleaned = re.sub(r"[:\s]+", " ", raw.lower()).strip()
-        return re.sub(r"[^a-z0-9 ]", "", cleaned)
-
-    for row in soup.select(".flex-row"):
-        label_el = row.select_one(".about-identifier")
+    for row in _SEL_ABOUT_ROW.select(soup):
+        label_el = _SEL_ABOUT_LABEL.select_one(row)
         if not label_el:
             continue
         raw_label = _safe_text(label_el)
         if not raw_label:
             continue
-        key_hint = _label_key(raw_label)
+        field = _about_field(raw_label)
+        if field is None:
+            continue  # not a field we keep; don't bother reading the value
 
-        value_el = row.select_one(".about-content") or row.select_one(".about-custom-content")
+        value_el = _SEL_ABOUT_CONTENT.select_one(row) or _SEL_ABOUT_CUSTOM_CONTENT.select_one(row)
         value = _safe_text(value_el)
         if not value:
             continue
-
-        if key_hint.startswith("location"):
-            details["location"] = value
-        elif key_hint.startswith("gender"):
-            details["gender"] = value
-        elif "myers briggs" in key_hint or key_hint == "mbti" or "type indicator" in key_hint:
-            details["mbti_type"] = value
-        elif "enneagram" in key_hint:
-            details["enneagram_type"] = value
-        elif "country of birth" in key_hint:
-            details["country_of_birth"] = value
-        elif "socionics" in key_hint:
-            details["socionics"] = value
-        elif "occupation" in key_hint:
-            details["occupation"] = value
+        details[field] = value
 
     return details
 
@@ -188,32 +283,30 @@ def _merge_user_details(user: dict, extra: dict[str, str | None]) -> None:
 
 def parse_user_profile_page(html: str, profile_url: str, user_id: str | None) -> dict | None:
     """Attempt to extract user data from the full profile page."""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
 
     username = None
-    header = soup.select_one("h1.p-title-value") or soup.select_one(".memberHeader-title")
+    header = _SEL_TITLE.select_one(soup) or _SEL_HEADER_TITLE.select_one(soup)
     if header:
         username = header.get_text(strip=True)
     if not username:
-        name_el = soup.select_one(".memberHeader-content .username")
+        name_el = _SEL_HEADER_USERNAME.select_one(soup)
         if name_el:
             username = name_el.get_text(strip=True)
 
     role = None
-    role_el = soup.select_one(".memberHeader-content .userTitle") or soup.select_one(".userTitle")
+    role_el = _SEL_HEADER_ROLE.select_one(soup) or _SEL_ROLE.select_one(soup)
     if role_el:
         role = role_el.get_text(strip=True)
 
-    join_date = None
-    time_el = soup.select_one(".memberHeader-content time") or soup.find("time", attrs={"itemprop": "dateCreated"})
-    if time_el:
-        join_date = _as_string(time_el.get("datetime")) or time_el.get_text(strip=True)
-
     location = _extract_location_from_header(soup)
 
-    stats = _collect_stats(soup.select("dl.pairs"))
-    if not join_date:
-        join_date = stats.get("joined")
+    stats = _collect_stats(_SEL_STATS_PAIRS.select(soup))
+    # Header first; the dateCreated microdata is only a fallback, wherever it sits.
+    time_el = _SEL_HEADER_TIME.select_one(soup) or _SEL_DATE_CREATED.select_one(soup)
+    join_date = (
+        time_el and (_as_string(time_el.get("datetime")) or time_el.get_text(strip=True))
+    ) or stats.get("joined")
 
     # TODO: get about me description as well, and follower and following list
     user = _build_user_record(
@@ -231,28 +324,28 @@ def parse_user_profile_page(html: str, profile_url: str, user_id: str | None) ->
 
 def parse_user_tooltip(html: str, profile_url: str, user_id: str | None) -> dict:
     """Parse tooltip HTML for a member into a structured dict."""
-    soup = BeautifulSoup(html, "html.parser")
-    tooltip = soup.select_one(".memberTooltip")
+    soup = BeautifulSoup(html, "lxml")
+    tooltip = _SEL_TOOLTIP.select_one(soup)
 
     username = None
     if tooltip:
-        name_el = tooltip.select_one(".memberTooltip-name a.username")
+        name_el = _SEL_TOOLTIP_USERNAME.select_one(tooltip)
         if name_el:
             username = name_el.get_text(strip=True)
 
     role = None
     if tooltip:
-        role_el = tooltip.select_one(".userTitle")
+        role_el = _SEL_ROLE.select_one(tooltip)
         if role_el:
             role = role_el.get_text(strip=True)
 
     join_date = None
     if tooltip:
-        time_el = tooltip.select_one(".memberTooltip-blurb time")
+        time_el = _SEL_TOOLTIP_TIME.select_one(tooltip)
         if time_el:
             join_date = _as_string(time_el.get("datetime")) or time_el.get_text(strip=True)
 
-    stats = _collect_stats(tooltip.select(".memberTooltip-stats dl") if tooltip else [])
+    stats = _collect_stats(_SEL_TOOLTIP_STATS.select(tooltip) if tooltip else [])
 
     return _build_user_record(
         user_id=user_id,
@@ -264,48 +357,75 @@ def parse_user_tooltip(html: str, profile_url: str, user_id: str | None) -> dict
     )
 
 
+def _fetch_about_data(about_url: str) -> dict[str, str | None]:
+    try:
+        return parse_user_about_page(fetch(about_url))
+    except Exception as exc:  # noqa: BLE001 - enrichment is optional
+        logger.warning("[user] Error fetching about tab %s: %s", about_url, exc)
+        return {}
+
 def fetch_user_profile(profile_url: str) -> dict | None:
-    """Prefer full profile page; fallback to tooltip when blocked."""
+    """
+    Prefer full profile page; fallback to tooltip when blocked.
+    The About tab is downloaded alongside the profile page rather than before it.
+    """
     user_id = extract_user_id_from_profile_url(profile_url)
     if not user_id:
-        print(f"[user] Could not parse user_id from {profile_url}")
+        logger.warning("[user] Could not parse user_id from %s", profile_url)
         return None
 
-    about_data: dict[str, str | None] = {}
     about_url = profile_url.rstrip("/") + "/about"
-    try:
-        about_html = fetch(about_url)
-        about_data = parse_user_about_page(about_html)
-    except Exception as exc:  # noqa: BLE001 - enrichment is optional
-        print(f"[user] Error fetching about tab {about_url}: {exc}")
+    about_future = _ABOUT_FETCHER.submit(_fetch_about_data, about_url)
 
     try:
         profile_html = fetch(profile_url)
     except Exception as exc:  # noqa: BLE001 - fallback to tooltip on any failure
-        print(f"[user] Error fetching profile page {profile_url}: {exc}")
+        logger.warning("[user] Error fetching profile page %s: %s", profile_url, exc)
         profile_html = None
 
     if profile_html:
         profile = parse_user_profile_page(profile_html, profile_url, user_id)
         if profile:
+            about_data = about_future.result()
             if about_data:
                 _merge_user_details(profile, about_data)
             return profile
-        print(f"[user] Profile page lacked data for {profile_url}, falling back to tooltip")
+        logger.info("[user] Profile page lacked data for %s, falling back to tooltip", profile_url)
 
     tooltip_url = profile_url.rstrip("/") + "/tooltip"
-    print(f"[user] Fetching tooltip {tooltip_url} (user_id={user_id})")
+    logger.info("[user] Fetching tooltip %s (user_id=%s)", tooltip_url, user_id)
     tooltip_html = fetch(tooltip_url)
     tooltip_user = parse_user_tooltip(tooltip_html, profile_url, user_id)
+    about_data = about_future.result()
     if about_data and tooltip_user:
         _merge_user_details(tooltip_user, about_data)
     return tooltip_user
 
 
-def get_or_fetch_user(profile_url: str, user_cache: dict[str, dict]) -> dict | None:
+@contextmanager
+def _user_fetch_lock(user_id: str) -> Iterator[None]:
+    with _fetch_locks_guard:
+        lock, refs = _fetch_locks.get(user_id, (None, 0))
+        lock = lock or threading.Lock()
+        _fetch_locks[user_id] = (lock, refs + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _fetch_locks_guard:
+            lock, refs = _fetch_locks[user_id]
+            if refs == 1:
+                del _fetch_locks[user_id]
+            else:
+                _fetch_locks[user_id] = (lock, refs - 1)
+
+def get_or_fetch_user(
+    profile_url: str,
+    user_cache: MutableMapping[str, dict],
+) -> dict | None:
     """
     Returns a user dict. Uses cache to avoid refetching profiles.
-    user_cache: {user_id: user_dict}
+    user_cache: {user_id: user_dict}, e.g. a dict or a persistent UserCache
     """
     if not profile_url:
         return None
@@ -314,10 +434,33 @@ def get_or_fetch_user(profile_url: str, user_cache: dict[str, dict]) -> dict | N
     if not user_id:
         return None
 
-    if user_id in user_cache:
-        return user_cache[user_id]
+    # One .get() rather than `in` + [], which would look a UserCache entry up twice.
+    if (user := user_cache.get(user_id)) is not None:
+        return user
+
+    with _user_fetch_lock(user_id):
+        # Another worker may have fetched this user while we waited.
+        if (user := user_cache.get(user_id)) is not None:
+            return user
+        profile = fetch_user_profile(profile_url)
+        if profile:
+            user_cache[user_id] = profile
+        return profile
 
-    profile = fetch_user_profile(profile_url)
-    if profile:
-        user_cache[user_id] = profile
-    return profile
+def fetch_users(
+    profile_urls: Iterable[str | None],
+    user_cache: MutableMapping[str, dict],
+) -> None:
+    """
+    Warm `user_cache` for many profiles at once: users not cached yet are fetched
+    concurrently instead of one after another. The per-user locks in
+    `get_or_fetch_user` still guarantee a single fetch per user.
+    """
+    missing = list(dict.fromkeys(
+        url for url in profile_urls
+        if url and (user_id := extract_user_id_from_profile_url(url)) and user_id not in user_cache
+    ))
+    if len(missing) < 2:
+        return  # nothing to overlap; the caller's own lookup will fetch it
+    for _ in _USER_FETCHER.map(lambda url: get_or_fetch_user(url, user_cache), missing):
+        pass
@@ -1,9 +1,11 @@
 import csv
 
-from scraper.data_model import USERS_FIELDNAMES
+from scraper.data_model import CSV_BUFFER_SIZE, USERS_FIELDNAMES
+from scraper.runners import configure_logging
 from scraper.user_scraper import fetch_user_profile
 
 def main() -> None:
+    configure_logging()
     user_urls = [
         # TODO: fill up with test data as required
         "https://www.personalitycafe.com/members/..."
@@ -27,11 +29,10 @@ def main() -> None:
         key = profile.get("user_id") or url
         users[key] = profile
 
-    with open(users_csv_path, "w", newline="", encoding="utf-8") as users_f:
+    with open(users_csv_path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as users_f:
         writer = csv.DictWriter(users_f, fieldnames=USERS_FIELDNAMES)
         writer.writeheader()
-        for row in users.values():
-            writer.writerow(row)
+        writer.writerows(users.values())
 
     print(f"[user-runner] Done. Wrote {len(users)} user rows to {users_csv_path}")
 